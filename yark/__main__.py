@@ -2,4 +2,6 @@
 
 from .cli import _cli
 
-_cli()
+# Guarded as downloading re-imports this module in its worker processes
+if __name__ == "__main__":
+    _cli()
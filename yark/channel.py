@@ -1,8 +1,17 @@
 """Channel and overall archive management with downloader"""
 
 from __future__ import annotations
-from datetime import datetime
+from datetime import datetime, timezone
 import json
+import itertools
+import hashlib
+import os
+import shutil
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
 from pathlib import Path
 import time
 from yt_dlp import YoutubeDL, DownloadError  # type: ignore
@@ -10,11 +19,17 @@ from colorama import Style, Fore
 import sys
 from .reporter import Reporter
 from .errors import ArchiveNotFoundException, _err_msg, VideoNotFoundException
-from .video import Video, Element
+from .video import Video
 from typing import Any
 import time
 from progress.spinner import PieSpinner
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
 import time
 
 ARCHIVE_COMPAT = 3
@@ -37,12 +52,26 @@ from typing import Optional
 
 
 class DownloadConfig:
+    __slots__ = (
+        "max_videos",
+        "max_livestreams",
+        "max_shorts",
+        "skip_download",
+        "skip_metadata",
+        "format",
+        "parallel_downloads",
+        "concurrent_fragments",
+        "safe",
+    )
     max_videos: Optional[int]
     max_livestreams: Optional[int]
     max_shorts: Optional[int]
     skip_download: bool
     skip_metadata: bool
     format: Optional[str]
+    parallel_downloads: int
+    concurrent_fragments: int
+    safe: bool
 
     def __init__(self) -> None:
         self.max_videos = None
@@ -51,6 +80,9 @@ class DownloadConfig:
         self.skip_download = False
         self.skip_metadata = False
         self.format = None
+        self.parallel_downloads = 4
+        self.concurrent_fragments = 8
+        self.safe = False
 
     def submit(self):
         """Submits configuration, this has the effect of normalising maximums to 0 properly"""
@@ -77,6 +109,10 @@ class DownloadConfig:
             )
             self.skip_download = True
 
+        # Some sites throttle aggressive fragmenting so safe mode fetches fragments one at a time
+        if self.safe:
+            self.concurrent_fragments = 1
+
 
 class VideoLogger:
     @staticmethod
@@ -99,6 +135,14 @@ class VideoLogger:
         elif d["status"] == "finished":
             print(Style.DIM + f"  • Downloaded {id}        " + Style.NORMAL)
 
+    @staticmethod
+    def downloading_parallel(d):
+        """Progress hook for video downloading when several downloads share the terminal, only printing whole lines"""
+        # Finished a video's download; percentages are skipped as they'd overwrite each other
+        if d["status"] == "finished":
+            id = d["info_dict"]["id"]
+            print(Style.DIM + f"  • Downloaded {id}" + Style.NORMAL)
+
     def debug(self, msg):
         """Debug log messages, ignored"""
         pass
@@ -117,6 +161,17 @@ class VideoLogger:
 
 
 class Channel:
+    __slots__ = (
+        "path",
+        "version",
+        "url",
+        "videos",
+        "livestreams",
+        "shorts",
+        "reporter",
+        "_index",
+        "_last_commit_hash",
+    )
     path: Path
     version: int
     url: str
@@ -124,6 +179,8 @@ class Channel:
     livestreams: list[Video]
     shorts: list[Video]
     reporter: Reporter
+    _index: dict[str, Video]
+    _last_commit_hash: Optional[bytes]
 
     @staticmethod
     def new(path: Path, url: str) -> Channel:
@@ -138,6 +195,8 @@ class Channel:
         channel.livestreams = []
         channel.shorts = []
         channel.reporter = Reporter(channel)
+        channel._index = {}
+        channel._last_commit_hash = None
 
         # Commit and return
         channel.commit()
@@ -160,17 +219,23 @@ class Channel:
             raise ArchiveNotFoundException("Archive doesn't exist")
 
         # Load config
-        encoded = json.load(open(path / "yark.json", "r"))
+        data = (path / "yark.json").read_bytes()
+        encoded = _json_loads(data)
 
         # Check version before fully decoding and exit if wrong
         archive_version = encoded["version"]
         if archive_version != ARCHIVE_COMPAT:
+            # Back up the old archive before it's migrated to the new version
+            if archive_version < ARCHIVE_COMPAT:
+                _backup(path)
             encoded = _migrate_archive(
                 archive_version, ARCHIVE_COMPAT, encoded, channel_name
             )
 
-        # Decode and return
-        return Channel._from_dict(encoded, path)
+        # Decode and remember what's on disk so unchanged commits can be skipped
+        channel = Channel._from_dict(encoded, path)
+        channel._last_commit_hash = _hash_archive(data)
+        return channel
 
     def metadata(self):
         """Queries YouTube for all channel metadata to refresh known videos"""
@@ -179,26 +244,12 @@ class Channel:
         print(msg, end="\r")
 
         # Download metadata and give the user a spinner bar
-        with ThreadPoolExecutor() as ex:
+        with ThreadPoolExecutor(max_workers=1) as ex:
             # Make future for downloading metadata
             future = ex.submit(self._download_metadata)
 
-            # Start spinning
-            with PieSpinner(f"{msg} ") as bar:
-                # Don't show bar for 2 seconds but check if future is done
-                no_bar_time = time.time() + 2
-                while time.time() < no_bar_time:
-                    if future.done():
-                        break
-                    time.sleep(0.25)
-
-                # Show loading spinner
-                while not future.done():
-                    bar.next()
-                    time.sleep(0.075)
-
-            # Get result from thread now that it's finished
-            res = future.result()
+            # Spin until we've got the result from the thread
+            res = _spin_until(future, msg)
 
         # Uncomment for saving big dumps for testing
         # with open(self.path / "dump.json", "w+") as file:
@@ -274,7 +325,12 @@ class Channel:
         self._report_deleted(self.shorts)
 
     def download(self, config: DownloadConfig):
-        """Downloads all videos which haven't already been downloaded"""
+        """
+        Downloads all videos which haven't already been downloaded
+
+        Videos are downloaded in worker processes, so scripts using this as a library
+        must call it from inside an `if __name__ == "__main__":` guard
+        """
         # Clean out old part files
         self._clean_parts()
 
@@ -284,123 +340,113 @@ class Channel:
             "outtmpl": f"{self.path}/videos/%(id)s.%(ext)s",
             # Centralized logger hook for ignoring all stdout
             "logger": VideoLogger(),
-            # Logger hook for download progress
-            "progress_hooks": [VideoLogger.downloading],
+            # Logger hook for download progress, using whole lines if several downloads share the terminal
+            "progress_hooks": [
+                VideoLogger.downloading
+                if config.parallel_downloads == 1
+                else VideoLogger.downloading_parallel
+            ],
+            # Concurrent fragment downloading for fragmented formats (#109 <https://github.com/Owez/yark/issues/109>)
+            "concurrent_fragment_downloads": config.concurrent_fragments,
         }
         if config.format is not None:
             settings["format"] = config.format
 
-        # Attach to the downloader
-        with YoutubeDL(settings) as ydl:
-            # Retry downloading 5 times in total for all videos
-            for i in range(5):
-                # Try to curate a list and download videos on it
-                try:
-                    # Curate list of non-downloaded videos
-                    not_downloaded = self._curate(config)
+        # Retry downloading 5 times in total for all videos
+        for i in range(5):
+            # Try to curate a list and download videos on it
+            try:
+                # Curate list of non-downloaded videos
+                not_downloaded = self._curate(config)
 
-                    # Stop if there's nothing to download
-                    if len(not_downloaded) == 0:
-                        break
+                # Stop if there's nothing to download
+                if len(not_downloaded) == 0:
+                    break
 
-                    # Print curated if this is the first time
-                    if i == 0:
-                        fmt_num = (
-                            "a new video"
-                            if len(not_downloaded) == 1
-                            else f"{len(not_downloaded)} new videos"
+                # Print curated if this is the first time
+                if i == 0:
+                    fmt_num = (
+                        "a new video"
+                        if len(not_downloaded) == 1
+                        else f"{len(not_downloaded)} new videos"
+                    )
+                    print(f"Downloading {fmt_num}..")
+
+                # Split curated videos round-robin into shards so each worker gets its own connection
+                workers = min(len(not_downloaded), config.parallel_downloads)
+                shards = [not_downloaded[ind::workers] for ind in range(workers)]
+                curated = {video.id: video for video in not_downloaded}
+
+                # Download each shard in its own process with its own downloader
+                with ProcessPoolExecutor(max_workers=workers) as ex:
+                    futures = [
+                        ex.submit(
+                            _download_shard,
+                            settings,
+                            [(video.id, video.url()) for video in shard],
                         )
-                        print(f"Downloading {fmt_num}..")
+                        for shard in shards
+                    ]
 
-                    # Continuously try to download after private/deleted videos are found
-                    # This block gives the downloader all the curated videos and skips/reports deleted videos by filtering their exceptions
-                    while True:
-                        # Download from curated list then exit the optimistic loop
+                    # Merge skipped videos back in as each shard finishes, holding onto errors until all are merged
+                    errors: list[Exception] = []
+                    for future in as_completed(futures):
                         try:
-                            urls = [video.url() for video in not_downloaded]
-                            ydl.download(urls)
-                            break
-
-                        # Special handling for private/deleted videos which are archived, if not we raise again
-                        except DownloadError as exception:
-                            # Video is privated or deleted
-                            if (
-                                "Private video" in exception.msg
-                                or "This video has been removed by the uploader"
-                                in exception.msg
-                            ):
-                                # Skip video from curated and get it as a return
-                                not_downloaded, video = _skip_video(
-                                    not_downloaded, "deleted"
-                                )
-
-                                # If this is a new occurrence then set it & report
-                                # This will only happen if its deleted after getting metadata, like in a dry run
-                                if video.deleted.current() == False:
-                                    self.reporter.deleted.append(video)
-                                    video.deleted.update(None, True)
-
-                            # User hasn't got ffmpeg installed and youtube hasn't got format 22
-                            # NOTE: see #55 <https://github.com/Owez/yark/issues/55> to learn more
-                            # NOTE: sadly yt-dlp doesn't let us access yt_dlp.utils.ContentTooShortError so we check msg
-                            elif " bytes, expected " in exception.msg:
-                                # Skip video from curated
-                                not_downloaded, _ = _skip_video(
-                                    not_downloaded,
-                                    "no format found; please download ffmpeg!",
-                                    True,
-                                )
-
-                            # Nevermind, normal exception
-                            else:
-                                raise exception
-
-                    # Stop if we've got them all
-                    break
-
-                # Report error and retry/stop
-                except Exception as exception:
-                    # Get around carriage return
-                    if i == 0:
-                        print()
-
-                    # Report error
-                    _err_dl("videos", exception, i != 4)
+                            skipped_deleted, failed = future.result()
+                        except Exception as exception:
+                            errors.append(exception)
+                            continue
+
+                        # Rebuild errors for videos which failed every retry
+                        errors.extend(DownloadError(msg) for msg in failed)
+
+                        for id in skipped_deleted:
+                            # If this is a new occurrence then set it & report
+                            # This will only happen if its deleted after getting metadata, like in a dry run
+                            video = curated[id]
+                            if video.deleted.current() == False:
+                                self.reporter.deleted.append(video)
+                                video.deleted.update(None, True)
+
+                # Raise the first shard error now that every finished shard has been reported
+                if len(errors) != 0:
+                    raise errors[0]
+
+                # Stop if we've got them all
+                break
+
+            # Report error and retry/stop
+            except Exception as exception:
+                # Get around carriage return
+                if i == 0:
+                    print()
+
+                # Report error
+                _err_dl("videos", exception, i != 4)
 
     def search(self, id: str):
         """Searches channel for a video with the corresponding `id` and returns"""
         # Search
-        for video in self.videos:
-            if video.id == id:
-                return video
+        try:
+            return self._index[id]
 
         # Raise exception if it's not found
-        raise VideoNotFoundException(f"Couldn't find {id} inside archive")
+        except KeyError:
+            raise VideoNotFoundException(f"Couldn't find {id} inside archive")
 
     def _curate(self, config: DownloadConfig) -> list[Video]:
         """Curate videos which aren't downloaded and return their urls"""
+        # Find everything that's already been downloaded in one pass
+        downloaded_ids = self._downloaded_ids()
 
         def curate_list(videos: list[Video], maximum: Optional[int]) -> list[Video]:
             """Curates the videos inside of the provided `videos` list to it's local maximum"""
             # Cut available videos to maximum if present for deterministic getting
             if maximum is not None:
-                # Fix the maximum to the length so we don't try to get more than there is
-                fixed_maximum = min(max(len(videos) - 1, 0), maximum)
-
-                # Set the available videos to this fixed maximum
-                new_videos = []
-                for ind in range(fixed_maximum):
-                    new_videos.append(videos[ind])
-                videos = new_videos
+                videos = videos[:maximum]
 
             # Find undownloaded videos in available list
-            not_downloaded = []
-            for video in videos:
-                if not video.downloaded():
-                    not_downloaded.append(video)
-
-            # Return
-            return not_downloaded
+            return [video for video in videos if video.id not in downloaded_ids]
 
         # Curate
         not_downloaded = []
@@ -411,10 +457,22 @@ class Channel:
         # Return
         return not_downloaded
 
+    def _downloaded_ids(self) -> set[str]:
+        """Gets the ids of every video which has been downloaded"""
+        with os.scandir(self.path / "videos") as entries:
+            return {
+                entry.name.rsplit(".", 1)[0]
+                for entry in entries
+                if not entry.name.endswith((".part", ".ytdl"))
+            }
+
     def commit(self):
         """Commits (saves) archive to path; do this once you've finished all of your transactions"""
-        # Save backup
-        self._backup()
+        # Skip committing entirely if nothing has changed since the last load/commit
+        payload = _json_dumps(self._to_dict())
+        payload_hash = _hash_archive(payload)
+        if payload_hash == self._last_commit_hash:
+            return
 
         # Directories
         print(f"Committing {self} to file..")
@@ -423,9 +481,14 @@ class Channel:
             if not path.exists():
                 path.mkdir()
 
-        # Config
-        with open(self.path / "yark.json", "w+") as file:
-            json.dump(self._to_dict(), file)
+        # Config, written next to the old archive and swapped in so a failed write never loses it
+        tmp = self.path / "yark.json.tmp"
+        with open(tmp, "wb") as file:
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, self.path / "yark.json")
+        self._last_commit_hash = payload_hash
 
     def _parse_metadata_videos(self, kind: str, i: list, bucket: list):
         """Parses metadata for a category of video into it's bucket and tells user what's happening"""
@@ -435,91 +498,57 @@ class Channel:
         print(msg, end="\r")
 
         # Start computing and show loading spinner
-        with ThreadPoolExecutor() as ex:
+        with ThreadPoolExecutor(max_workers=1) as ex:
             # Make future for computation of the video list
             future = ex.submit(self._parse_metadata_videos_comp, i, bucket)
 
-            # Start spinning
-            with PieSpinner(f"{msg} ") as bar:
-                # Don't show bar for 2 seconds but check if future is done
-                no_bar_time = time.time() + 2
-                while time.time() < no_bar_time:
-                    if future.done():
-                        return
-                    time.sleep(0.25)
-
-                # Spin until future is done
-                while not future.done():
-                    time.sleep(0.075)
-                    bar.next()
+            # Spin until future is done
+            _spin_until(future, msg)
 
     def _parse_metadata_videos_comp(self, i: list, bucket: list):
         """Computes the actual parsing for `_parse_metadata_videos` without outputting what's happening"""
-        for entry in i:
-            # Skip video if there's no formats available; happens with upcoming videos/livestreams
-            if "formats" not in entry or len(entry["formats"]) == 0:
-                continue
-
-            # Updated intra-loop marker
-            updated = False
-
-            # Update video if it exists
-            for video in bucket:
-                if video.id == entry["id"]:
-                    video.update(entry)
-                    updated = True
-                    break
+        # Update known videos in this category and find new ones
+        existing = {video.id: video for video in bucket}
+        new_videos = _parse_entries(i, existing, self)
 
-            # Add new video if not
-            if not updated:
-                video = Video.new(entry, self)
-                bucket.append(video)
-                self.reporter.added.append(video)
+        # Add, index and report new videos in one go
+        bucket.extend(new_videos)
+        for video in new_videos:
+            self._index[video.id] = video
+        self.reporter.added.extend(new_videos)
 
         # Sort videos by newest
         bucket.sort(reverse=True)
 
     def _report_deleted(self, videos: list):
         """Goes through a video category to report & save those which where not marked in the metadata as deleted if they're not already known to be deleted"""
-        for video in videos:
-            if video.deleted.current() == False and not video.known_not_deleted:
-                self.reporter.deleted.append(video)
-                video.deleted.update(None, True)
+        # Find newly deleted videos
+        newly_deleted = [
+            video
+            for video in videos
+            if video.deleted.current() == False and not video.known_not_deleted
+        ]
+
+        # Report and save them in one go
+        self.reporter.deleted.extend(newly_deleted)
+        for video in newly_deleted:
+            video.deleted.update(None, True)
 
     def _clean_parts(self):
         """Cleans old temporary `.part` files which where stopped during download if present"""
-        # Make a bucket for found files
-        deletion_bucket: list[Path] = []
-
-        # Scan through and find part files
-        videos = self.path / "videos"
-        for file in videos.iterdir():
-            if file.suffix == ".part" or file.suffix == ".ytdl":
-                deletion_bucket.append(file)
+        # Scan through and find part files into a bucket
+        with os.scandir(self.path / "videos") as entries:
+            deletion_bucket = [
+                entry.path
+                for entry in entries
+                if entry.name.endswith((".part", ".ytdl"))
+            ]
 
         # Print and delete if there are part files present
         if len(deletion_bucket) != 0:
             print("Cleaning out previous temporary files..")
             for file in deletion_bucket:
-                file.unlink()
-
-    def _backup(self):
-        """Creates a backup of the existing `yark.json` file in path as `yark.bak` with added comments"""
-        # Get current archive path
-        ARCHIVE_PATH = self.path / "yark.json"
-
-        # Skip backing up if the archive doesn't exist
-        if not ARCHIVE_PATH.exists():
-            return
-
-        # Open original archive to copy
-        with open(self.path / "yark.json", "r") as file_archive:
-            # Add comment information to backup file
-            save = f"// Backup of a Yark archive, dated {datetime.utcnow().isoformat()}\n// Remove these comments and rename to 'yark.json' to restore\n{file_archive.read()}"
-
-            # Save new information into a new backup
-            with open(self.path / "yark.bak", "w+") as file_backup:
-                file_backup.write(save)
+                os.unlink(file)
 
     @staticmethod
     def _from_dict(encoded: dict, path: Path) -> Channel:
@@ -529,15 +558,26 @@ class Channel:
         channel.version = encoded["version"]
         channel.url = encoded["url"]
         channel.reporter = Reporter(channel)
-        channel.videos = [
-            Video._from_dict(video, channel) for video in encoded["videos"]
-        ]
-        channel.livestreams = [
-            Video._from_dict(video, channel) for video in encoded["livestreams"]
-        ]
-        channel.shorts = [
-            Video._from_dict(video, channel) for video in encoded["shorts"]
-        ]
+
+        # Decode each category of video concurrently as they're independent
+        def decode(bucket: list[dict]) -> list[Video]:
+            return [Video._from_dict(video, channel) for video in bucket]
+
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            videos = ex.submit(decode, encoded["videos"])
+            livestreams = ex.submit(decode, encoded["livestreams"])
+            shorts = ex.submit(decode, encoded["shorts"])
+            channel.videos = videos.result()
+            channel.livestreams = livestreams.result()
+            channel.shorts = shorts.result()
+
+        channel._last_commit_hash = None
+        channel._index = {
+            video.id: video
+            for video in itertools.chain(
+                channel.videos, channel.livestreams, channel.shorts
+            )
+        }
         return channel
 
     def _to_dict(self) -> dict:
@@ -554,51 +594,134 @@ class Channel:
         return self.path.name
 
 
-def _skip_video(
-    videos: list[Video],
-    reason: str,
-    warning: bool = False,
-) -> tuple[list[Video], Video]:
-    """Skips first undownloaded video in `videos`, make sure there's at least one to skip otherwise an exception will be thrown"""
-    # Find fist undownloaded video
-    for ind, video in enumerate(videos):
-        if not video.downloaded():
-            # Tell the user we're skipping over it
-            if warning:
-                print(
-                    Fore.YELLOW + f"  • Skipping {video.id} ({reason})" + Fore.RESET,
-                    file=sys.stderr,
-                )
-            else:
-                print(
-                    Style.DIM + f"  • Skipping {video.id} ({reason})" + Style.NORMAL,
-                )
-
-            # Set videos to skip over this one
-            videos = videos[ind + 1 :]
-
-            # Return the corrected list and the video found
-            return videos, video
-
-    # Shouldn't happen, see docs
-    raise Exception(
-        "We expected to skip a video and return it but nothing to skip was found"
-    )
+def _parse_entries(
+    entries: list[dict[str, Any]], existing: dict[str, Video], channel: Channel
+) -> list[Video]:
+    """Parses metadata `entries` against `existing` videos by id, returning the new videos which have been added to `existing`"""
+    new_videos: list[Video] = []
+    for entry in entries:
+        # Skip video if there's no formats available; happens with upcoming videos/livestreams
+        if "formats" not in entry or len(entry["formats"]) == 0:
+            continue
+
+        # Update video if it exists
+        video = existing.get(entry["id"])
+        if video is not None:
+            video.update(entry)
+
+        # Add new video if not
+        else:
+            video = Video.new(entry, channel)
+            existing[video.id] = video
+            new_videos.append(video)
+
+    # Return
+    return new_videos
+
+
+def _spin_until(future: Future, msg: str) -> Any:
+    """Blocks until `future` is done whilst showing a spinner bar with `msg` if it's taking a while, returning its result"""
+    # Don't show bar for 2 seconds
+    # NOTE: we wait instead of timing out on result() as the future itself might raise a TimeoutError
+    if not wait([future], timeout=2).done:
+        # Show loading spinner, ticking each time we time out waiting for the future
+        with PieSpinner(f"{msg} ") as bar:
+            while not wait([future], timeout=0.075).done:
+                bar.next()
+
+    # Finish the line ourselves as there's no spinner to do it
+    else:
+        print(msg)
+
+    # Get result now that it's finished
+    return future.result()
+
+
+def _download_shard(
+    settings: dict[str, Any], shard: list[tuple[str, str]]
+) -> tuple[list[str], list[str]]:
+    """Downloads a shard of `(id, url)` videos with its own downloader, returning the ids of videos skipped as deleted and the error messages of videos which failed every retry"""
+    skipped_deleted: list[str] = []
+    failed: list[str] = []
+
+    # Attach to the downloader
+    with YoutubeDL(settings) as ydl:
+        # Download each video on its own so private/deleted videos can be skipped/reported as soon as they fail
+        for id, url in shard:
+            # Retry each video 3 times so one flaky video doesn't stop the rest of the shard
+            for i in range(3):
+                try:
+                    ydl.download([url])
+                    break
+
+                # Special handling for private/deleted videos which are archived, if not we retry
+                except DownloadError as exception:
+                    # Video is privated or deleted
+                    if (
+                        "Private video" in exception.msg
+                        or "This video has been removed by the uploader"
+                        in exception.msg
+                    ):
+                        # Skip video and remember it for reporting
+                        _skip_video(id, "deleted")
+                        skipped_deleted.append(id)
+                        break
+
+                    # User hasn't got ffmpeg installed and youtube hasn't got format 22
+                    # NOTE: see #55 <https://github.com/Owez/yark/issues/55> to learn more
+                    # NOTE: sadly yt-dlp doesn't let us access yt_dlp.utils.ContentTooShortError so we check msg
+                    elif " bytes, expected " in exception.msg:
+                        # Skip video
+                        _skip_video(
+                            id, "no format found; please download ffmpeg!", True
+                        )
+                        break
+
+                    # Nevermind, normal exception so skip it for now if it's out of retries
+                    # NOTE: only the message is kept as the exception's traceback can't be sent back from the worker process
+                    elif i == 2:
+                        _skip_video(id, "failed to download", True)
+                        failed.append(exception.msg)
+
+    # Return skipped and failed videos so they can be reported
+    return skipped_deleted, failed
+
+
+def _skip_video(id: str, reason: str, warning: bool = False):
+    """Tells the user we're skipping over the video with the provided `id`"""
+    if warning:
+        print(
+            Fore.YELLOW + f"  • Skipping {id} ({reason})" + Fore.RESET,
+            file=sys.stderr,
+        )
+    else:
+        print(
+            Style.DIM + f"  • Skipping {id} ({reason})" + Style.NORMAL,
+        )
 
 
 def _migrate_archive(
     current_version: int, expected_version: int, encoded: dict, channel_name: str
 ) -> dict:
     """Automatically migrates an archive from one version to another by bootstrapping"""
+    # Archives from newer versions of Yark can't be migrated back
+    if current_version > expected_version:
+        _err_msg(
+            f"Unknown archive version v{current_version} found during migration", True
+        )
+        sys.exit(1)
 
-    def migrate_step(cur: int, encoded: dict) -> dict:
-        """Step in recursion to migrate from one to another, contains migration logic"""
-        # Stop because we've reached the desired version
-        if cur == expected_version:
-            return encoded
+    # Inform user of the backup process
+    print(
+        Fore.YELLOW
+        + f"Automatically migrating archive from v{current_version} to v{expected_version}, a backup has been made at {channel_name}/yark.bak"
+        + Fore.RESET
+    )
 
+    # Step through each version until the desired version has been reached
+    for cur in range(current_version, expected_version):
         # From version 1 to version 2
-        elif cur == 1:
+        if cur == 1:
             # Channel id to url
             encoded["url"] = "https://www.youtube.com/channel/" + encoded["id"]
             del encoded["id"]
@@ -617,33 +740,60 @@ def _migrate_archive(
         # From version 2 to version 3
         elif cur == 2:
             # Add deleted status to every video/livestream/short
-            # NOTE: none is fine for new elements, just a slight bodge
-            for video in encoded["videos"]:
-                video["deleted"] = Element.new(Video._new_empty(), False)._to_dict()
-            for video in encoded["livestreams"]:
-                video["deleted"] = Element.new(Video._new_empty(), False)._to_dict()
-            for video in encoded["shorts"]:
-                video["deleted"] = Element.new(Video._new_empty(), False)._to_dict()
+            template = {datetime.utcnow().isoformat(): False}
+            for bucket in ("videos", "livestreams", "shorts"):
+                for video in encoded[bucket]:
+                    video["deleted"] = dict(template)
 
         # Unknown version
         else:
             _err_msg(f"Unknown archive version v{cur} found during migration", True)
             sys.exit(1)
 
-        # Increment version and run again until version has been reached
-        cur += 1
-        encoded["version"] = cur
-        return migrate_step(cur, encoded)
+        # Increment version
+        encoded["version"] = cur + 1
+
+    # Return migrated archive
+    return encoded
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decodes archive json, using orjson if it's installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encodes archive json to bytes, using orjson if it's installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def _backup(path: Path):
+    """Creates a backup of the existing `yark.json` file in `path` as `yark.bak` with added comments"""
+    # Get current archive path
+    ARCHIVE_PATH = path / "yark.json"
+
+    # Skip backing up if the archive doesn't exist
+    if not ARCHIVE_PATH.exists():
+        return
+
+    # Open original archive to copy
+    with open(ARCHIVE_PATH, "rb") as file_archive:
+        with open(path / "yark.bak", "wb+") as file_backup:
+            # Add comment information to backup file
+            comments = f"// Backup of a Yark archive, dated {datetime.now(timezone.utc).isoformat()}\n// Remove these comments and rename to 'yark.json' to restore\n"
+            file_backup.write(comments.encode())
+
+            # Stream the archive into the backup in chunks
+            shutil.copyfileobj(file_archive, file_backup, 1 << 16)
 
-    # Inform user of the backup process
-    print(
-        Fore.YELLOW
-        + f"Automatically migrating archive from v{current_version} to v{expected_version}, a backup has been made at {channel_name}/yark.bak"
-        + Fore.RESET
-    )
 
-    # Start recursion step
-    return migrate_step(current_version, encoded)
+def _hash_archive(data: bytes) -> bytes:
+    """Hashes encoded archive data to check if it's changed between commits"""
+    return hashlib.blake2b(data, digest_size=16, usedforsecurity=False).digest()
 
 
 def _err_dl(name: str, exception: DownloadError, retrying: bool):
@@ -226,7 +226,7 @@ class Element:
 
     def current(self):
         """Returns most recent element"""
-        return self.inner[list(self.inner.keys())[-1]]
+        return self.inner[next(reversed(self.inner))]
 
     def changed(self) -> bool:
         """Checks if the value has ever been modified from it's original state"""